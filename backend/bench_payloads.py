@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, Callable
+import psycopg
+
+from dev_server import load_function_module
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def measure(run: Callable[[], Any]) -> Dict[str, Any]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    measurement = {'peak_mb': round(peak / 1024 / 1024, 2), 'seconds': round(elapsed, 4)}
+    if isinstance(result, dict) and 'statusCode' in result:
+        measurement['status'] = result['statusCode']
+    return measurement
+
+def legacy_publish(module: Any, body: str) -> None:
+    request_data = module.PublishRequest(**json.loads(body))
+    escaped = [value.replace("'", "''") for value in (request_data.html_content, request_data.css_content, request_data.js_content)]
+    query = f"INSERT INTO websites VALUES ('{escaped[0]}', '{escaped[1]}', '{escaped[2]}')"
+    del query
+
+def main() -> None:
+    '''
+    Business: Report peak memory per publish/update request through the full handler path at several payload sizes
+    Args: optional payload sizes in MB on the command line; DATABASE_URL must point at a database with the migrations applied
+    Returns: One JSON line per measurement on stdout; benchmark sites are deleted afterwards
+    '''
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        sys.exit('DATABASE_URL is not configured')
+    
+    # Repeated calls from one process would otherwise be throttled by the handlers' own token buckets
+    os.environ.setdefault('RATE_LIMIT_CAPACITY', '1000000')
+    
+    sizes_mb = [float(arg) for arg in sys.argv[1:]] or [1, 4, 8]
+    publish = load_function_module(os.path.join(BACKEND_DIR, 'publish-site'))
+    update = load_function_module(os.path.join(BACKEND_DIR, 'update-site'))
+    owner_keys = []
+    
+    for size_mb in sizes_mb:
+        # Payloads are built before each measurement starts, so only allocations made by the request path are traced
+        html_content = "<p>it's a page</p>" * int(size_mb * 1024 * 1024 / 18)
+        pages = [{'name': 'Главная', 'html': html_content[:1024], 'route': '#main'}]
+        publish_body = json.dumps({
+            'title': 'Bench', 'description': 'Bench', 'html_content': html_content,
+            'css_content': 'body {}', 'js_content': 'console.log(1);', 'pages': pages
+        })
+        body_mb = round(len(publish_body) / 1024 / 1024, 2)
+        common = {'body_mb': body_mb, 'max_body_mb': round(publish.MAX_BODY_BYTES / 1024 / 1024, 2)}
+        
+        if len(publish_body.encode('utf-8')) > publish.MAX_BODY_BYTES:
+            print(json.dumps({'case': 'skipped', **common, 'reason': 'body exceeds MAX_BODY_BYTES and would be rejected with 413'}))
+            del html_content, publish_body
+            continue
+        
+        publish_event = {'httpMethod': 'POST', 'body': publish_body}
+        print(json.dumps({'case': 'publish-site legacy parse', **common, **measure(lambda: legacy_publish(publish, publish_body))}))
+        
+        published: Dict[str, Any] = {}
+        def run_publish() -> Dict[str, Any]:
+            response = publish.handler(publish_event, None)
+            published.update(json.loads(response['body']))
+            return response
+        print(json.dumps({'case': 'publish-site handler', **common, **measure(run_publish)}))
+        owner_keys.append(published['owner_key'])
+        
+        update_body = json.dumps({
+            'owner_key': published['owner_key'], 'slug': published['slug'],
+            'html_content': html_content, 'pages': pages
+        })
+        del html_content, publish_body, publish_event
+        update_event = {'httpMethod': 'PUT', 'body': update_body}
+        print(json.dumps({'case': 'update-site handler', **common, **measure(lambda: update.handler(update_event, None))}))
+        del update_body, update_event
+    
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM websites WHERE owner_key = ANY(%s)", (owner_keys,))
+
+if __name__ == '__main__':
+    main()
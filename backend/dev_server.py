@@ -0,0 +1,137 @@
+import asyncio
+import base64
+import glob
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from urllib.parse import parse_qsl
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEV_SERVER_WORKERS = int(os.environ.get('DEV_SERVER_WORKERS', '16'))
+
+class FunctionContext:
+    def __init__(self, function_name: str) -> None:
+        self.request_id = str(uuid.uuid4())
+        self.function_name = function_name
+
+def load_function_module(function_dir: str) -> Any:
+    function_name = os.path.basename(function_dir)
+    spec = importlib.util.spec_from_file_location(f"functions.{function_name.replace('-', '_')}", os.path.join(function_dir, 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    loaded_before = set(sys.modules)
+    sys.path.insert(0, function_dir)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(function_dir)
+        # Sibling modules such as admission.py belong to one function; drop them so the next function imports its own copy
+        for name in set(sys.modules) - loaded_before:
+            if os.path.dirname(getattr(sys.modules[name], '__file__', None) or '') == function_dir:
+                del sys.modules[name]
+    return module
+
+def load_functions(backend_dir: str = BACKEND_DIR) -> Dict[str, Any]:
+    functions = {}
+    for path in sorted(glob.glob(os.path.join(backend_dir, '*', 'index.py'))):
+        function_dir = os.path.dirname(path)
+        functions[os.path.basename(function_dir)] = load_function_module(function_dir).handler
+    return functions
+
+def build_event(scope: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    headers = {name.decode('latin-1').title(): value.decode('latin-1') for name, value in scope['headers']}
+    client_ip = scope['client'][0] if scope.get('client') else '127.0.0.1'
+    try:
+        text_body, is_base64 = body.decode('utf-8'), False
+    except UnicodeDecodeError:
+        text_body, is_base64 = base64.b64encode(body).decode('ascii'), True
+    return {
+        'httpMethod': scope['method'],
+        'headers': headers,
+        'queryStringParameters': dict(parse_qsl(scope['query_string'].decode('latin-1'))),
+        'body': text_body,
+        'isBase64Encoded': is_base64,
+        'requestContext': {'identity': {'sourceIp': client_ip}}
+    }
+
+def build_response(result: Dict[str, Any], elapsed: float) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    body = result.get('body', '')
+    if not isinstance(body, str):
+        body = json.dumps(body)
+    payload = base64.b64decode(body) if result.get('isBase64Encoded') else body.encode('utf-8')
+    headers = [(name.lower().encode('latin-1'), str(value).encode('latin-1')) for name, value in (result.get('headers') or {}).items()]
+    headers.append((b'server-timing', f"handler;dur={elapsed * 1000:.1f}".encode('latin-1')))
+    return result.get('statusCode', 200), headers, payload
+
+class Gateway:
+    '''
+    Business: Serve every backend/*/index.py handler locally under /<function-name> for load tests and profiling
+    Args: ASGI scope, receive, send; sync handlers run in a bounded thread pool, async handlers are awaited
+    Returns: Handler response translated back to HTTP
+    '''
+    def __init__(self, functions: Dict[str, Any], workers: int = DEV_SERVER_WORKERS) -> None:
+        self.functions = functions
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='handler')
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        
+        function_name = scope['path'].strip('/').split('/', 1)[0]
+        handler = self.functions.get(function_name)
+        if handler is None:
+            await self.send(send, 404, [(b'content-type', b'application/json')], json.dumps({'error': f'Unknown function: {function_name}', 'functions': sorted(self.functions)}).encode('utf-8'))
+            return
+        
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        
+        event = build_event(scope, b''.join(chunks))
+        context = FunctionContext(function_name)
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(handler):
+                result = await handler(event, context)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(self.executor, handler, event, context)
+        except Exception as error:
+            traceback.print_exc()
+            result = {'statusCode': 500, 'headers': {'Content-Type': 'application/json'}, 'body': json.dumps({'error': repr(error)})}
+        
+        status, headers, payload = build_response(result, time.perf_counter() - started)
+        await self.send(send, status, headers, payload)
+    
+    async def lifespan(self, receive: Any, send: Any) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    @staticmethod
+    async def send(send: Any, status: int, headers: List[Tuple[bytes, bytes]], payload: bytes) -> None:
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+app = Gateway(load_functions())
+
+if __name__ == '__main__':
+    import uvicorn
+    
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    print(f"Functions: {', '.join(sorted(app.functions))}")
+    uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning')
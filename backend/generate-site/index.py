@@ -2,6 +2,8 @@ import json
 from typing import Dict, Any, List
 from pydantic import BaseModel, Field
 
+from admission import check_rate_limit, client_key, enter_in_flight, leave_in_flight, stats_response, too_many_requests
+
 class GenerateRequest(BaseModel):
     description: str = Field(..., min_length=1)
     pages: List[str] = []
@@ -264,6 +266,26 @@ document.head.appendChild(style);'''
         }
     }
 
+def generate_site(event: Dict[str, Any]) -> Dict[str, Any]:
+    retry_after = check_rate_limit(client_key(event))
+    if retry_after:
+        return too_many_requests(retry_after)
+    
+    body_data = json.loads(event.get('body', '{}'))
+    request_data = GenerateRequest(**body_data)
+    
+    result = generate_multipage_site(request_data.description, request_data.pages)
+    
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'isBase64Encoded': False,
+        'body': json.dumps(result)
+    }
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Generate multi-page website code based on user description
@@ -277,13 +299,16 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'statusCode': 200,
             'headers': {
                 'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Max-Age': '86400'
             },
             'body': ''
         }
     
+    if method == 'GET':
+        return stats_response('generate-site')
+    
     if method != 'POST':
         return {
             'statusCode': 405,
@@ -295,17 +320,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': 'Method not allowed'})
         }
     
-    body_data = json.loads(event.get('body', '{}'))
-    request_data = GenerateRequest(**body_data)
-    
-    result = generate_multipage_site(request_data.description, request_data.pages)
-    
-    return {
-        'statusCode': 200,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-        },
-        'isBase64Encoded': False,
-        'body': json.dumps(result)
-    }
+    if not enter_in_flight():
+        return too_many_requests(1)
+    try:
+        return generate_site(event)
+    finally:
+        leave_in_flight()
@@ -5,9 +5,9 @@ import psycopg
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
-    Business: Get all websites owned by specific owner key
-    Args: event with httpMethod, queryStringParameters; context with request_id
-    Returns: List of owned websites
+    Business: Get all websites owned by specific owner key, or only their counts in summary mode
+    Args: event with httpMethod, queryStringParameters (owner_key, summary); context with request_id
+    Returns: List of owned websites, or site/page/domain counts from the owner_stats rollup
     '''
     method: str = event.get('httpMethod', 'GET')
     
@@ -60,6 +60,28 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': 'Database not configured'})
         }
     
+    if params.get('summary') in ('1', 'true'):
+        with psycopg.connect(database_url, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT site_count, page_count, domain_count, last_updated FROM owner_stats WHERE owner_key = %s", (owner_key,))
+                result = cur.fetchone()
+        
+        site_count, page_count, domain_count, last_updated = result or (0, 0, 0, None)
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'isBase64Encoded': False,
+            'body': json.dumps({
+                'site_count': site_count,
+                'page_count': page_count,
+                'domain_count': domain_count,
+                'last_updated': last_updated.isoformat() if last_updated else None
+            })
+        }
+    
     owner_esc = owner_key.replace("'", "''")
     
     with psycopg.connect(database_url, autocommit=True) as conn:
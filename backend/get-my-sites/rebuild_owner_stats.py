@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+from typing import Dict, Any, Optional
+import psycopg
+
+def rebuild_owner_stats(database_url: str, owner_key: Optional[str] = None) -> Dict[str, Any]:
+    '''
+    Business: Rebuild the owner_stats rollup from websites to repair drift in the trigger-maintained counters
+    Args: database_url, owner_key to repair a single owner instead of the whole table
+    Returns: Number of owners whose rows were rewritten and how many differed from the rebuilt values
+    '''
+    owner_filter = "AND owner_key = %(owner_key)s" if owner_key else ""
+    stats_filter = "WHERE owner_key = %(owner_key)s" if owner_key else ""
+    params = {'owner_key': owner_key}
+    
+    with psycopg.connect(database_url) as conn:
+        with conn.cursor() as cur:
+            # Writers wait until the rebuild commits so their trigger deltas apply on top of it. A single owner only
+            # locks its own rows, websites before owner_stats, in the same order as the trigger
+            if owner_key:
+                cur.execute("SELECT id FROM websites WHERE owner_key = %(owner_key)s FOR SHARE", params)
+                cur.execute("SELECT owner_key FROM owner_stats WHERE owner_key = %(owner_key)s FOR UPDATE", params)
+            else:
+                cur.execute("LOCK TABLE websites IN SHARE MODE")
+            
+            cur.execute(
+                f"""
+                CREATE TEMP TABLE rebuilt_owner_stats ON COMMIT DROP AS
+                SELECT owner_key, COUNT(*)::INTEGER AS site_count,
+                       COALESCE(SUM(website_page_count(pages)), 0)::INTEGER AS page_count,
+                       COUNT(custom_domain)::INTEGER AS domain_count,
+                       MAX(updated_at) AS last_updated
+                FROM websites
+                WHERE owner_key IS NOT NULL {owner_filter}
+                GROUP BY owner_key
+                """,
+                params
+            )
+            
+            cur.execute(
+                f"""
+                SELECT COUNT(*)
+                FROM (SELECT * FROM owner_stats {stats_filter}) current_stats
+                FULL JOIN rebuilt_owner_stats rebuilt USING (owner_key)
+                WHERE (current_stats.site_count, current_stats.page_count, current_stats.domain_count)
+                      IS DISTINCT FROM (rebuilt.site_count, rebuilt.page_count, rebuilt.domain_count)
+                """,
+                params
+            )
+            drifted = cur.fetchone()[0]
+            
+            cur.execute(f"DELETE FROM owner_stats {stats_filter}", params)
+            cur.execute(
+                """
+                INSERT INTO owner_stats (owner_key, site_count, page_count, domain_count, last_updated)
+                SELECT owner_key, site_count, page_count, domain_count, last_updated FROM rebuilt_owner_stats
+                """
+            )
+            rebuilt = cur.rowcount
+    
+    return {'owners': rebuilt, 'drifted': drifted}
+
+if __name__ == '__main__':
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        sys.exit('DATABASE_URL is not configured')
+    
+    print(json.dumps(rebuild_owner_stats(database_url, sys.argv[1] if len(sys.argv) > 1 else None)))
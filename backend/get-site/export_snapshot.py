@@ -0,0 +1,125 @@
+import glob
+import json
+import os
+import sys
+from typing import Dict, Any, List, Optional
+import psycopg
+
+from index import render_site, index_path
+
+# Rows stamped by writers that started before the previous watermark but committed after it are picked up by re-scanning this window
+SNAPSHOT_OVERLAP_MINUTES = int(os.environ.get('SNAPSHOT_OVERLAP_MINUTES', '10'))
+
+def empty_index() -> Dict[str, Any]:
+    return {'bundle': None, 'exported_at': None, 'entries': {}, 'keys_by_id': {}}
+
+def load_index(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return empty_index()
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_index(path: str, index: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def remove_stale_bundles(bundle_dir: str, keep: List[str]) -> None:
+    # Unlinking is safe for instances that still map an old bundle; the previous one is kept for readers mid-reload
+    for path in glob.glob(os.path.join(bundle_dir, 'sites.bundle.*')):
+        if os.path.basename(path) not in keep:
+            os.remove(path)
+
+def export_snapshot(database_url: str, bundle_dir: str, full: bool = False) -> Dict[str, Any]:
+    '''
+    Business: Render published websites into an append-only bundle with an offset index for get-site
+    Args: database_url, bundle_dir for sites.bundle.* and sites.index.json, full to start a new bundle file
+    Returns: Export stats with the new snapshot watermark
+    '''
+    os.makedirs(bundle_dir, exist_ok=True)
+    
+    previous = load_index(index_path(bundle_dir))
+    full = full or previous['bundle'] is None
+    index = empty_index() if full else previous
+    since: Optional[str] = index['exported_at']
+    entries: Dict[str, List[int]] = index['entries']
+    keys_by_id: Dict[str, List[str]] = index['keys_by_id']
+    
+    written = 0
+    removed = 0
+    
+    # Server-side cursors need a transaction, so this connection is not autocommit
+    with psycopg.connect(database_url) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT now()")
+            exported_at = cur.fetchone()[0]
+        
+        columns = "id, slug, custom_domain, published, html_content, css_content, js_content"
+        if since:
+            query = f"SELECT {columns} FROM websites WHERE updated_at > %s::timestamptz - %s * interval '1 minute'"
+            params = (since, SNAPSHOT_OVERLAP_MINUTES)
+        else:
+            query = f"SELECT {columns} FROM websites WHERE published = true"
+            params = ()
+        
+        # A full export never truncates a bundle that running instances may have mapped, it starts a new file
+        if full:
+            index['bundle'] = f"sites.bundle.{exported_at.strftime('%Y%m%dT%H%M%S%f')}"
+        bundle_path = os.path.join(bundle_dir, index['bundle'])
+        
+        with open(bundle_path, 'ab') as bundle:
+            offset = bundle.tell()
+            with conn.cursor(name='snapshot_export') as cur:
+                cur.itersize = 100
+                cur.execute(query, params)
+                for website_id, slug, custom_domain, published, html_content, css_content, js_content in cur:
+                    old_keys = keys_by_id.pop(website_id, [])
+                    for key in old_keys:
+                        entries.pop(key, None)
+                    
+                    if not published:
+                        removed += 1 if old_keys else 0
+                        continue
+                    
+                    page = render_site(html_content, css_content, js_content).encode('utf-8')
+                    bundle.write(page)
+                    
+                    keys = [f"slug:{slug}"]
+                    if custom_domain:
+                        keys.append(f"domain:{custom_domain.lower()}")
+                    for key in keys:
+                        entries[key] = [offset, len(page)]
+                    keys_by_id[website_id] = keys
+                    
+                    offset += len(page)
+                    written += 1
+            
+            bundle.flush()
+            os.fsync(bundle.fileno())
+    
+    # The index is swapped in only after the bundle bytes it points to are on disk
+    index['exported_at'] = exported_at.isoformat()
+    write_index(index_path(bundle_dir), index)
+    remove_stale_bundles(bundle_dir, keep=[index['bundle'], previous['bundle']])
+    
+    return {
+        'bundle': index['bundle'],
+        'exported_at': index['exported_at'],
+        'incremental': since is not None,
+        'written': written,
+        'removed': removed,
+        'sites': len(keys_by_id),
+        'bundle_bytes': offset
+    }
+
+if __name__ == '__main__':
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        sys.exit('DATABASE_URL is not configured')
+    
+    bundle_dir = os.environ.get('SITE_BUNDLE_DIR', 'snapshot')
+    stats = export_snapshot(database_url, bundle_dir, full='--full' in sys.argv[1:])
+    print(json.dumps(stats))
@@ -1,11 +1,88 @@
 import json
+import mmap
 import os
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 import psycopg
 
+NOT_FOUND_PAGE = '''
+            <!DOCTYPE html>
+            <html>
+            <head><title>404</title></head>
+            <body style="font-family: sans-serif; text-align: center; padding: 100px;">
+                <h1>404 - Сайт не найден</h1>
+                <p>Проверьте правильность ссылки</p>
+            </body>
+            </html>
+            '''
+
+# Snapshot bundle written by export_snapshot.py; kept mapped between warm invocations
+_bundle_lock = threading.Lock()
+_bundle_state: Dict[str, Any] = {'version': None, 'entries': {}, 'mmap': None}
+
+def render_site(html_content: str, css_content: str, js_content: str) -> str:
+    return f'''<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Published Site</title>
+    <style>{css_content}</style>
+</head>
+<body>
+    {html_content if html_content.strip().startswith('<') else f'<div>{html_content}</div>'}
+    <script>{js_content}</script>
+</body>
+</html>'''
+
+def index_path(bundle_dir: str) -> str:
+    return os.path.join(bundle_dir, 'sites.index.json')
+
+def _load_bundle(bundle_dir: str) -> Tuple[Dict[str, List[int]], Optional[mmap.mmap]]:
+    try:
+        stat = os.stat(index_path(bundle_dir))
+    except FileNotFoundError:
+        return {}, None
+    
+    # The exporter swaps the index with os.replace, so a new inode means a new index
+    version = (stat.st_ino, stat.st_mtime_ns)
+    with _bundle_lock:
+        if version == _bundle_state['version']:
+            return _bundle_state['entries'], _bundle_state['mmap']
+        
+        with open(index_path(bundle_dir), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        
+        bundle_mmap = None
+        if index['entries']:
+            # Bundles are append-only and never truncated, so remapping picks up records added since the last load
+            with open(os.path.join(bundle_dir, index['bundle']), 'rb') as bundle_file:
+                bundle_mmap = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        # The previous mapping is not closed here: other threads may still hold slices of it, and it is released once they finish
+        _bundle_state.update({'version': version, 'entries': index['entries'], 'mmap': bundle_mmap})
+        return index['entries'], bundle_mmap
+
+def read_from_bundle(bundle_dir: str, slug: str, domain: str) -> Optional[str]:
+    # Any snapshot problem is a miss: the cached state is left as is so the next call retries, and this one falls back to Postgres
+    try:
+        entries, bundle_mmap = _load_bundle(bundle_dir)
+        
+        key = f"slug:{slug}" if slug else f"domain:{domain.lower()}"
+        entry = entries.get(key)
+        if not entry or bundle_mmap is None:
+            return None
+        
+        offset, length = entry
+        with memoryview(bundle_mmap)[offset:offset + length] as page:
+            return str(page, 'utf-8')
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Snapshot bundle unavailable, falling back to database: {error!r}")
+        return None
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
-    Business: Get published website by slug and return rendered HTML
+    Business: Get published website by slug or custom domain and return rendered HTML
     Args: event with httpMethod, queryStringParameters; context with request_id
     Returns: Full HTML page with embedded CSS and JS
     '''
@@ -36,8 +113,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     
     params = event.get('queryStringParameters', {}) or {}
     slug = params.get('slug', '')
+    domain = params.get('domain', '')
     
-    if not slug:
+    if not slug and not domain:
         return {
             'statusCode': 400,
             'headers': {
@@ -45,9 +123,24 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'Access-Control-Allow-Origin': '*'
             },
             'isBase64Encoded': False,
-            'body': '<h1>Slug parameter required</h1>'
+            'body': '<h1>Slug or domain parameter required</h1>'
         }
     
+    bundle_dir = os.environ.get('SITE_BUNDLE_DIR')
+    if bundle_dir:
+        full_page = read_from_bundle(bundle_dir, slug, domain)
+        if full_page is not None:
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'text/html',
+                    'Access-Control-Allow-Origin': '*',
+                    'X-Site-Source': 'snapshot'
+                },
+                'isBase64Encoded': False,
+                'body': full_page
+            }
+    
     database_url = os.environ.get('DATABASE_URL')
     if not database_url:
         return {
@@ -60,12 +153,15 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': '<h1>Database not configured</h1>'
         }
     
-    escaped_slug = slug.replace("'", "''")
+    if slug:
+        condition, value = "slug = %s", slug
+    else:
+        condition, value = "lower(custom_domain) = %s", domain.lower()
     
     with psycopg.connect(database_url, autocommit=True) as conn:
         with conn.cursor() as cur:
-            query = f"SELECT html_content, css_content, js_content FROM websites WHERE slug = '{escaped_slug}' AND published = true"
-            cur.execute(query)
+            query = f"SELECT html_content, css_content, js_content FROM websites WHERE {condition} AND published = true"
+            cur.execute(query, (value,))
             result = cur.fetchone()
     
     if not result:
@@ -76,33 +172,12 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'Access-Control-Allow-Origin': '*'
             },
             'isBase64Encoded': False,
-            'body': '''
-            <!DOCTYPE html>
-            <html>
-            <head><title>404</title></head>
-            <body style="font-family: sans-serif; text-align: center; padding: 100px;">
-                <h1>404 - Сайт не найден</h1>
-                <p>Проверьте правильность ссылки</p>
-            </body>
-            </html>
-            '''
+            'body': NOT_FOUND_PAGE
         }
     
     html_content, css_content, js_content = result
     
-    full_page = f'''<!DOCTYPE html>
-<html lang="ru">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Published Site</title>
-    <style>{css_content}</style>
-</head>
-<body>
-    {html_content if html_content.strip().startswith('<') else f'<div>{html_content}</div>'}
-    <script>{js_content}</script>
-</body>
-</html>'''
+    full_page = render_site(html_content, css_content, js_content)
     
     return {
         'statusCode': 200,
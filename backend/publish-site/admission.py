@@ -0,0 +1,132 @@
+# Admission control shared by generate-site, publish-site and update-site.
+# Functions are deployed folder by folder, so each one carries a copy of this file;
+# edit backend/shared/admission.py and run backend/sync_shared.py to update the copies.
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+RATE_LIMIT_CAPACITY = float(os.environ.get('RATE_LIMIT_CAPACITY', '10'))
+RATE_LIMIT_REFILL_PER_SEC = float(os.environ.get('RATE_LIMIT_REFILL_PER_SEC', '1'))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '10000'))
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'local')
+RATE_LIMIT_PRUNE_INTERVAL_SEC = float(os.environ.get('RATE_LIMIT_PRUNE_INTERVAL_SEC', '60'))
+# Counted per instance, not across the function: it only sheds load where one instance serves requests concurrently
+MAX_IN_FLIGHT = int(os.environ.get('MAX_IN_FLIGHT', '4'))
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {'in_flight': 0, 'rejected_in_flight': 0, 'rejected_rate_limit': 0}
+
+class LocalBucketStore:
+    def __init__(self) -> None:
+        self._buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def take(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (RATE_LIMIT_CAPACITY, now))
+            tokens = min(RATE_LIMIT_CAPACITY, tokens + (now - last) * RATE_LIMIT_REFILL_PER_SEC)
+            allowed = tokens >= 1
+            # Re-inserting keeps the dict in least-recently-used order, so the oldest bucket is evicted first
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > RATE_LIMIT_MAX_KEYS:
+                self._buckets.popitem(last=False)
+            return 0.0 if allowed else (1 - tokens) / RATE_LIMIT_REFILL_PER_SEC
+
+class PostgresBucketStore:
+    def __init__(self) -> None:
+        self._last_prune = 0.0
+    
+    def take(self, cur: Any, key: str) -> float:
+        self._prune(cur)
+        cur.execute(
+            """
+            INSERT INTO rate_limits (bucket_key, tokens, updated_at)
+            VALUES (%(key)s, %(capacity)s - 1, now())
+            ON CONFLICT (bucket_key) DO UPDATE
+            SET tokens = LEAST(%(capacity)s, rate_limits.tokens + EXTRACT(EPOCH FROM now() - rate_limits.updated_at) * %(rate)s) - 1,
+                updated_at = now()
+            WHERE LEAST(%(capacity)s, rate_limits.tokens + EXTRACT(EPOCH FROM now() - rate_limits.updated_at) * %(rate)s) >= 1
+            RETURNING tokens
+            """,
+            {'key': key, 'capacity': RATE_LIMIT_CAPACITY, 'rate': RATE_LIMIT_REFILL_PER_SEC}
+        )
+        return 0.0 if cur.fetchone() else 1 / RATE_LIMIT_REFILL_PER_SEC
+    
+    def _prune(self, cur: Any) -> None:
+        # A row untouched for capacity / rate seconds has refilled completely, so deleting it changes nothing
+        now = time.monotonic()
+        if now - self._last_prune < RATE_LIMIT_PRUNE_INTERVAL_SEC:
+            return
+        self._last_prune = now
+        cur.execute(
+            "DELETE FROM rate_limits WHERE updated_at < now() - %s * interval '1 second'",
+            (RATE_LIMIT_CAPACITY / RATE_LIMIT_REFILL_PER_SEC,)
+        )
+
+_local_buckets = LocalBucketStore()
+_shared_buckets = PostgresBucketStore() if RATE_LIMIT_STORE == 'postgres' else None
+
+def client_key(event: Dict[str, Any]) -> str:
+    identity = (event.get('requestContext') or {}).get('identity') or {}
+    headers = event.get('headers') or {}
+    # Only the last X-Forwarded-For hop is appended by the platform proxy; earlier entries come from the client
+    forwarded = headers.get('X-Forwarded-For') or headers.get('x-forwarded-for') or ''
+    return f"ip:{identity.get('sourceIp') or forwarded.split(',')[-1].strip() or 'unknown'}"
+
+def _count_rate_limited(retry_after: float) -> float:
+    if retry_after:
+        with _stats_lock:
+            _stats['rejected_rate_limit'] += 1
+    return retry_after
+
+def check_rate_limit(key: str) -> float:
+    return _count_rate_limited(_local_buckets.take(key))
+
+def check_shared_rate_limit(cur: Any, key: str) -> float:
+    # The local bucket is the fast path; the shared one bounds a client across all instances
+    if _shared_buckets is None:
+        return 0.0
+    return _count_rate_limited(_shared_buckets.take(cur, key))
+
+def enter_in_flight() -> bool:
+    with _stats_lock:
+        if _stats['in_flight'] >= MAX_IN_FLIGHT:
+            _stats['rejected_in_flight'] += 1
+            return False
+        _stats['in_flight'] += 1
+        return True
+
+def leave_in_flight() -> None:
+    with _stats_lock:
+        _stats['in_flight'] -= 1
+
+def too_many_requests(retry_after: float) -> Dict[str, Any]:
+    return {
+        'statusCode': 429,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Expose-Headers': 'Retry-After',
+            'Retry-After': str(max(1, math.ceil(retry_after)))
+        },
+        'isBase64Encoded': False,
+        'body': json.dumps({'error': 'Too many requests'})
+    }
+
+def stats_response(function_name: str) -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'isBase64Encoded': False,
+        'body': json.dumps({'function': function_name, 'scope': 'instance', 'max_in_flight': MAX_IN_FLIGHT, **stats})
+    }
@@ -3,8 +3,13 @@ import os
 import uuid
 import re
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 import psycopg
+from psycopg.types.json import Jsonb
+
+from admission import check_rate_limit, check_shared_rate_limit, client_key, enter_in_flight, leave_in_flight, stats_response, too_many_requests
+
+MAX_BODY_BYTES = int(os.environ.get('MAX_BODY_BYTES', str(10 * 1024 * 1024)))
 
 class PageData(BaseModel):
     name: str
@@ -27,40 +32,56 @@ def generate_slug(title: str) -> str:
     slug = slug[:50]
     return f"{slug}-{str(uuid.uuid4())[:8]}"
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    '''
-    Business: Publish generated website to database and get public URL
-    Args: event with httpMethod, body; context with request_id
-    Returns: Published website URL and metadata
-    '''
-    method: str = event.get('httpMethod', 'GET')
+def body_too_large(event: Dict[str, Any]) -> bool:
+    headers = event.get('headers') or {}
+    content_length = headers.get('Content-Length') or headers.get('content-length') or ''
+    if content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        return True
     
-    if method == 'OPTIONS':
+    # A UTF-8 character takes 1 to 4 bytes, so the body is only encoded when its length alone cannot decide
+    body = event.get('body') or ''
+    if len(body) > MAX_BODY_BYTES:
+        return True
+    if len(body) * 4 <= MAX_BODY_BYTES:
+        return False
+    return len(body.encode('utf-8')) > MAX_BODY_BYTES
+
+def parse_request(event: Dict[str, Any]) -> PublishRequest:
+    return PublishRequest.model_validate_json(event.get('body') or '{}')
+
+def publish_site(event: Dict[str, Any]) -> Dict[str, Any]:
+    rate_key = client_key(event)
+    retry_after = check_rate_limit(rate_key)
+    if retry_after:
+        return too_many_requests(retry_after)
+    
+    if body_too_large(event):
         return {
-            'statusCode': 200,
+            'statusCode': 413,
             'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Max-Age': '86400'
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
             },
-            'body': ''
+            'isBase64Encoded': False,
+            'body': json.dumps({'error': f'Request body exceeds {MAX_BODY_BYTES} bytes'})
         }
     
-    if method != 'POST':
+    try:
+        request_data = parse_request(event)
+    except ValidationError as error:
         return {
-            'statusCode': 405,
+            'statusCode': 400,
             'headers': {
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
             'isBase64Encoded': False,
-            'body': json.dumps({'error': 'Method not allowed'})
+            'body': json.dumps({
+                'error': 'Invalid request body',
+                'details': [{'loc': list(e['loc']), 'msg': e['msg'], 'type': e['type']} for e in error.errors()]
+            })
         }
     
-    body_data = json.loads(event.get('body', '{}'))
-    request_data = PublishRequest(**body_data)
-    
     database_url = os.environ.get('DATABASE_URL')
     if not database_url:
         return {
@@ -77,28 +98,24 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     slug = generate_slug(request_data.title)
     owner_key = str(uuid.uuid4())
     
-    pages_json = json.dumps([p.dict() for p in request_data.pages]) if request_data.pages else '[]'
-    
-    title_esc = request_data.title.replace("'", "''")
-    desc_esc = request_data.description.replace("'", "''")
-    html_esc = request_data.html_content.replace("'", "''")
-    css_esc = request_data.css_content.replace("'", "''")
-    js_esc = request_data.js_content.replace("'", "''")
-    domain_esc = request_data.custom_domain.replace("'", "''") if request_data.custom_domain else 'NULL'
+    pages = [p.model_dump() for p in request_data.pages]
     
+    # Content is sent as bound parameters so large fields are not copied into an escaped SQL string
     with psycopg.connect(database_url, autocommit=True) as conn:
         with conn.cursor() as cur:
-            if request_data.custom_domain:
-                query = f"""
-                    INSERT INTO websites (id, title, description, html_content, css_content, js_content, slug, published, owner_key, custom_domain, pages)
-                    VALUES ('{website_id}', '{title_esc}', '{desc_esc}', '{html_esc}', '{css_esc}', '{js_esc}', '{slug}', true, '{owner_key}', '{domain_esc}', '{pages_json}')
-                """
-            else:
-                query = f"""
-                    INSERT INTO websites (id, title, description, html_content, css_content, js_content, slug, published, owner_key, pages)
-                    VALUES ('{website_id}', '{title_esc}', '{desc_esc}', '{html_esc}', '{css_esc}', '{js_esc}', '{slug}', true, '{owner_key}', '{pages_json}')
+            retry_after = check_shared_rate_limit(cur, rate_key)
+            if retry_after:
+                return too_many_requests(retry_after)
+            
+            cur.execute(
                 """
-            cur.execute(query)
+                INSERT INTO websites (id, title, description, html_content, css_content, js_content, slug, published, owner_key, custom_domain, pages)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, true, %s, %s, %s)
+                """,
+                (website_id, request_data.title, request_data.description, request_data.html_content,
+                 request_data.css_content, request_data.js_content, slug, owner_key,
+                 request_data.custom_domain or None, Jsonb(pages))
+            )
     
     if request_data.custom_domain:
         public_url = f"https://{request_data.custom_domain}"
@@ -120,4 +137,45 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'url': public_url,
             'message': 'Сайт успешно опубликован!'
         })
-    }
\ No newline at end of file
+    }
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Publish generated website to database and get public URL
+    Args: event with httpMethod, body; context with request_id
+    Returns: Published website URL and metadata
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': ''
+        }
+    
+    if method == 'GET':
+        return stats_response('publish-site')
+    
+    if method != 'POST':
+        return {
+            'statusCode': 405,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'isBase64Encoded': False,
+            'body': json.dumps({'error': 'Method not allowed'})
+        }
+    
+    if not enter_in_flight():
+        return too_many_requests(1)
+    try:
+        return publish_site(event)
+    finally:
+        leave_in_flight()
@@ -0,0 +1,37 @@
+import filecmp
+import os
+import shutil
+import sys
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Functions are deployed folder by folder, so shared modules are copied into every function that imports them
+SHARED_MODULES: Dict[str, List[str]] = {
+    'admission.py': ['generate-site', 'publish-site', 'update-site'],
+}
+
+def sync_shared(check: bool = False) -> List[str]:
+    '''
+    Business: Copy modules from backend/shared into the function folders that use them
+    Args: check to only report out-of-date copies instead of writing them
+    Returns: Paths of copies that were (or in check mode, would be) rewritten
+    '''
+    stale = []
+    for module, functions in SHARED_MODULES.items():
+        source = os.path.join(BACKEND_DIR, 'shared', module)
+        for function_name in functions:
+            target = os.path.join(BACKEND_DIR, function_name, module)
+            if os.path.exists(target) and filecmp.cmp(source, target, shallow=False):
+                continue
+            stale.append(os.path.relpath(target, BACKEND_DIR))
+            if not check:
+                shutil.copyfile(source, target)
+    return stale
+
+if __name__ == '__main__':
+    check = '--check' in sys.argv[1:]
+    stale = sync_shared(check)
+    for path in stale:
+        print(f"{'out of date' if check else 'updated'}: {path}")
+    sys.exit(1 if check and stale else 0)
@@ -1,8 +1,13 @@
 import json
 import os
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 import psycopg
+from psycopg.types.json import Jsonb
+
+from admission import check_rate_limit, check_shared_rate_limit, client_key, enter_in_flight, leave_in_flight, stats_response, too_many_requests
+
+MAX_BODY_BYTES = int(os.environ.get('MAX_BODY_BYTES', str(10 * 1024 * 1024)))
 
 class PageData(BaseModel):
     name: str
@@ -18,40 +23,57 @@ class UpdateRequest(BaseModel):
     title: Optional[str] = None
     pages: Optional[List[PageData]] = None
 
-def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-    '''
-    Business: Update website content by owner key
-    Args: event with httpMethod, body; context with request_id
-    Returns: Updated website metadata
-    '''
-    method: str = event.get('httpMethod', 'GET')
+def body_too_large(event: Dict[str, Any]) -> bool:
+    headers = event.get('headers') or {}
+    content_length = headers.get('Content-Length') or headers.get('content-length') or ''
+    if content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        return True
     
-    if method == 'OPTIONS':
+    # A UTF-8 character takes 1 to 4 bytes, so the body is only encoded when its length alone cannot decide
+    body = event.get('body') or ''
+    if len(body) > MAX_BODY_BYTES:
+        return True
+    if len(body) * 4 <= MAX_BODY_BYTES:
+        return False
+    return len(body.encode('utf-8')) > MAX_BODY_BYTES
+
+def parse_request(event: Dict[str, Any]) -> UpdateRequest:
+    return UpdateRequest.model_validate_json(event.get('body') or '{}')
+
+def update_site(event: Dict[str, Any]) -> Dict[str, Any]:
+    # owner_key comes from the unauthenticated body, so the client IP bucket is checked first and the owner bucket only once ownership is verified
+    ip_key = client_key(event)
+    retry_after = check_rate_limit(ip_key)
+    if retry_after:
+        return too_many_requests(retry_after)
+    
+    if body_too_large(event):
         return {
-            'statusCode': 200,
+            'statusCode': 413,
             'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'PUT, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Max-Age': '86400'
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
             },
-            'body': ''
+            'isBase64Encoded': False,
+            'body': json.dumps({'error': f'Request body exceeds {MAX_BODY_BYTES} bytes'})
         }
     
-    if method != 'PUT':
+    try:
+        request_data = parse_request(event)
+    except ValidationError as error:
         return {
-            'statusCode': 405,
+            'statusCode': 400,
             'headers': {
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
             'isBase64Encoded': False,
-            'body': json.dumps({'error': 'Method not allowed'})
+            'body': json.dumps({
+                'error': 'Invalid request body',
+                'details': [{'loc': list(e['loc']), 'msg': e['msg'], 'type': e['type']} for e in error.errors()]
+            })
         }
     
-    body_data = json.loads(event.get('body', '{}'))
-    request_data = UpdateRequest(**body_data)
-    
     database_url = os.environ.get('DATABASE_URL')
     if not database_url:
         return {
@@ -64,13 +86,13 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': 'Database not configured'})
         }
     
-    owner_esc = request_data.owner_key.replace("'", "''")
-    slug_esc = request_data.slug.replace("'", "''")
-    
     with psycopg.connect(database_url, autocommit=True) as conn:
         with conn.cursor() as cur:
-            check_query = f"SELECT id FROM websites WHERE slug = '{slug_esc}' AND owner_key = '{owner_esc}'"
-            cur.execute(check_query)
+            retry_after = check_shared_rate_limit(cur, ip_key)
+            if retry_after:
+                return too_many_requests(retry_after)
+            
+            cur.execute("SELECT id FROM websites WHERE slug = %s AND owner_key = %s", (request_data.slug, request_data.owner_key))
             result = cur.fetchone()
             
             if not result:
@@ -84,26 +106,34 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'body': json.dumps({'error': 'Access denied or website not found'})
                 }
             
+            owner_rate_key = f"owner:{request_data.owner_key}"
+            retry_after = check_rate_limit(owner_rate_key) or check_shared_rate_limit(cur, owner_rate_key)
+            if retry_after:
+                return too_many_requests(retry_after)
+            
+            # Content is sent as bound parameters so large fields are not copied into an escaped SQL string
             updates = []
+            values: List[Any] = []
             if request_data.html_content:
-                html_esc = request_data.html_content.replace("'", "''")
-                updates.append(f"html_content = '{html_esc}'")
+                updates.append("html_content = %s")
+                values.append(request_data.html_content)
             if request_data.css_content:
-                css_esc = request_data.css_content.replace("'", "''")
-                updates.append(f"css_content = '{css_esc}'")
+                updates.append("css_content = %s")
+                values.append(request_data.css_content)
             if request_data.js_content:
-                js_esc = request_data.js_content.replace("'", "''")
-                updates.append(f"js_content = '{js_esc}'")
+                updates.append("js_content = %s")
+                values.append(request_data.js_content)
             if request_data.title:
-                title_esc = request_data.title.replace("'", "''")
-                updates.append(f"title = '{title_esc}'")
+                updates.append("title = %s")
+                values.append(request_data.title)
             if request_data.pages:
-                pages_json = json.dumps([p.dict() for p in request_data.pages])
-                updates.append(f"pages = '{pages_json}'")
+                updates.append("pages = %s")
+                values.append(Jsonb([p.model_dump() for p in request_data.pages]))
             
             if updates:
-                update_query = f"UPDATE websites SET {', '.join(updates)} WHERE slug = '{slug_esc}' AND owner_key = '{owner_esc}'"
-                cur.execute(update_query)
+                updates.append("updated_at = CURRENT_TIMESTAMP")
+                update_query = f"UPDATE websites SET {', '.join(updates)} WHERE slug = %s AND owner_key = %s"
+                cur.execute(update_query, (*values, request_data.slug, request_data.owner_key))
     
     return {
         'statusCode': 200,
@@ -117,3 +147,44 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'message': 'Сайт успешно обновлён!'
         })
     }
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Update website content by owner key
+    Args: event with httpMethod, body; context with request_id
+    Returns: Updated website metadata
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, PUT, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': ''
+        }
+    
+    if method == 'GET':
+        return stats_response('update-site')
+    
+    if method != 'PUT':
+        return {
+            'statusCode': 405,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'isBase64Encoded': False,
+            'body': json.dumps({'error': 'Method not allowed'})
+        }
+    
+    if not enter_in_flight():
+        return too_many_requests(1)
+    try:
+        return update_site(event)
+    finally:
+        leave_in_flight()
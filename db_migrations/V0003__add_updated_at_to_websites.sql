@@ -0,0 +1,4 @@
+ALTER TABLE websites ADD COLUMN updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP;
+
+CREATE INDEX idx_websites_updated_at ON websites(updated_at);
+CREATE INDEX idx_websites_custom_domain_lower ON websites(lower(custom_domain));
@@ -0,0 +1,7 @@
+CREATE TABLE rate_limits (
+    bucket_key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_rate_limits_updated_at ON rate_limits(updated_at);
@@ -0,0 +1,46 @@
+CREATE TABLE owner_stats (
+    owner_key TEXT PRIMARY KEY,
+    site_count INTEGER NOT NULL DEFAULT 0,
+    page_count INTEGER NOT NULL DEFAULT 0,
+    domain_count INTEGER NOT NULL DEFAULT 0,
+    last_updated TIMESTAMPTZ
+);
+
+CREATE FUNCTION website_page_count(pages JSONB) RETURNS INTEGER AS $$
+    SELECT CASE WHEN jsonb_typeof(pages) = 'array' THEN jsonb_array_length(pages) ELSE 0 END
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE FUNCTION maintain_owner_stats() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.owner_key IS NOT NULL THEN
+        UPDATE owner_stats
+        SET site_count = site_count - 1,
+            page_count = page_count - website_page_count(OLD.pages),
+            domain_count = domain_count - (OLD.custom_domain IS NOT NULL)::INTEGER,
+            last_updated = now()
+        WHERE owner_key = OLD.owner_key;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.owner_key IS NOT NULL THEN
+        INSERT INTO owner_stats (owner_key, site_count, page_count, domain_count, last_updated)
+        VALUES (NEW.owner_key, 1, website_page_count(NEW.pages), (NEW.custom_domain IS NOT NULL)::INTEGER, now())
+        ON CONFLICT (owner_key) DO UPDATE
+        SET site_count = owner_stats.site_count + 1,
+            page_count = owner_stats.page_count + EXCLUDED.page_count,
+            domain_count = owner_stats.domain_count + EXCLUDED.domain_count,
+            last_updated = EXCLUDED.last_updated;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER websites_owner_stats
+AFTER INSERT OR DELETE OR UPDATE OF owner_key, pages, custom_domain, html_content, css_content, js_content, title ON websites
+FOR EACH ROW EXECUTE FUNCTION maintain_owner_stats();
+
+INSERT INTO owner_stats (owner_key, site_count, page_count, domain_count, last_updated)
+SELECT owner_key, COUNT(*), SUM(website_page_count(pages)), COUNT(custom_domain), MAX(updated_at)
+FROM websites
+WHERE owner_key IS NOT NULL
+GROUP BY owner_key;